@@ -1,8 +1,11 @@
 import os
+import concurrent.futures
 import pandas as pd
 import sqlalchemy
 from typing import Optional, Literal
 import contextlib
+import threading
+from types import MappingProxyType
 
 import utils
 
@@ -13,10 +16,14 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.schema import CreateSchema
 
 
-class DBConfig(utils.Model):
+class DBConfig(utils.ConfigModel):
+    _SECRET_FIELDS = ('password',)
+
     def __init__(self, delicate: str = 'postgresql', host: str = 'localhost', port: int = 5432,
                  database: str = None, username: str = None, password: str = None, auth_file: str = None,
-                 query: dict = None, stream: bool = False, echo: bool = False):
+                 query: dict = None, stream: bool = False, echo: bool = False, pool_size: int = 5,
+                 max_overflow: int = 10, pool_recycle: int = 300, pool_pre_ping: bool = True,
+                 warm_pool: bool = False):
 
         self.__delicate = delicate
         self.__host = host
@@ -24,21 +31,29 @@ class DBConfig(utils.Model):
         self.__database = database
         self.__username = username
         self.__password = password
-        self.__auth_file = auth_file
+        self.__auth_file = None
+        self.__auth_mtime = None
+        # Through the setter, so the file is checked and its mtime recorded
+        self.auth_file = auth_file
         self.__stream = stream
         self.__echo = echo
-        self.__query = query.copy() if query else {}
+        self.__pool_size = pool_size
+        self.__max_overflow = max_overflow
+        self.__pool_recycle = pool_recycle
+        self.__pool_pre_ping = pool_pre_ping
+        self.__warm_pool = warm_pool
+        self.__query = MappingProxyType(dict(query) if query else {})
 
     @property
     def query(self):
-
-        return self.__query.copy() if self.__query else self.__query
+        # Read-only view, callers can not mutate the config through it.
+        return self.__query
 
     @query.setter
     def query(self, query):
         if query is not None and not isinstance(query, dict):
             raise ValueError("Query must be a dict.")
-        self.__query = query.copy() if query else {}
+        self.__query = MappingProxyType(dict(query) if query else {})
 
     @property
     def delicate(self):
@@ -132,6 +147,56 @@ class DBConfig(utils.Model):
             raise ValueError("Password must be a string or None.")
         self.__echo = echo
 
+    @property
+    def pool_size(self):
+        return self.__pool_size
+
+    @pool_size.setter
+    def pool_size(self, pool_size):
+        if not isinstance(pool_size, int) or pool_size < 1:
+            raise ValueError("Pool size must be a positive integer.")
+        self.__pool_size = pool_size
+
+    @property
+    def max_overflow(self):
+        return self.__max_overflow
+
+    @max_overflow.setter
+    def max_overflow(self, max_overflow):
+        if not isinstance(max_overflow, int) or max_overflow < -1:
+            raise ValueError("Max overflow must be an integer greater than or equal to -1.")
+        self.__max_overflow = max_overflow
+
+    @property
+    def pool_recycle(self):
+        return self.__pool_recycle
+
+    @pool_recycle.setter
+    def pool_recycle(self, pool_recycle):
+        if not isinstance(pool_recycle, int) or pool_recycle < -1:
+            raise ValueError("Pool recycle must be an integer number of seconds, or -1 to disable.")
+        self.__pool_recycle = pool_recycle
+
+    @property
+    def pool_pre_ping(self):
+        return self.__pool_pre_ping
+
+    @pool_pre_ping.setter
+    def pool_pre_ping(self, pool_pre_ping):
+        if not isinstance(pool_pre_ping, bool):
+            raise ValueError("Pool pre ping must be a boolean.")
+        self.__pool_pre_ping = pool_pre_ping
+
+    @property
+    def warm_pool(self):
+        return self.__warm_pool
+
+    @warm_pool.setter
+    def warm_pool(self, warm_pool):
+        if not isinstance(warm_pool, bool):
+            raise ValueError("Warm pool must be a boolean.")
+        self.__warm_pool = warm_pool
+
     @property
     def auth_file(self):
         return self.__auth_file
@@ -139,29 +204,75 @@ class DBConfig(utils.Model):
     @auth_file.setter
     def auth_file(self, auth_file):
         # Validation logic for jks_file
-        if auth_file is not None and not isinstance(auth_file, str):
+        if auth_file is None:
+            self.__auth_file = None
+            self.__auth_mtime = None
+            return
+        if not isinstance(auth_file, str):
             raise ValueError("JKS file path must be a string or None.")
-        if not os.path.exists(auth_file):
+        try:
+            stat = os.stat(auth_file)
+        except FileNotFoundError:
             raise FileNotFoundError(f"Authentication file '{auth_file}' not found.")
         self.__auth_file = auth_file
+        self.__auth_mtime = stat.st_mtime
+
+    @property
+    def auth_mtime(self):
+        return self.__auth_mtime
+
+
+# Shared engines keyed by connection URL and pool settings, each entry is [engine, number of DBConnection users]
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+
+def _acquire_engine(conn_url, echo: bool, pool_size: int, max_overflow: int, pool_recycle: int, pool_pre_ping: bool):
+    """
+    Create an engine once per connection URL and pool settings, so connections to the same database share a pool.
+
+    Every call must be paired with _release_engine on the returned key.
+
+    :param conn_url: SQLAlchemy URL, hashable and compared on all of its parts including the password.
+    :return: (key, engine) tuple.
+    """
+    key = (conn_url, echo, pool_size, max_overflow, pool_recycle, pool_pre_ping)
+    with _ENGINES_LOCK:
+        entry = _ENGINES.get(key)
+        if entry is None:
+            engine = create_engine(
+                conn_url,
+                echo=echo,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                future=True,
+            )
+            entry = _ENGINES[key] = [engine, 0]
+        entry[1] += 1
+        return key, entry[0]
+
 
-    # Update method for dynamic configuration
-    def update_config(self, **kwargs):
-        for key, value in kwargs.items():
-            setter_method = f"{key}"
-            if hasattr(self, setter_method):
-                try:
-                    getattr(self, setter_method)(value)
-                except Exception as e:
-                    raise ValueError(f"Error setting {key}: {str(e)}")
-            else:
-                raise KeyError(f"Invalid configuration key: {key}")
+def _release_engine(key):
+    """Drop one user of a shared engine, its pool is only disposed once the last user is gone."""
+    with _ENGINES_LOCK:
+        entry = _ENGINES.get(key)
+        if entry is None:
+            return False
+        entry[1] -= 1
+        if entry[1] > 0:
+            return False
+        del _ENGINES[key]
+    entry[0].dispose()
+    return True
 
 
 class DBConnection:
     def __init__(self, config: DBConfig, logger):
         # SSH Tunnel Variables
         self.__engine = None
+        self.__engine_key = None
         self.__inspector = None
         self.__metadata = MetaData()
         self.__config = config
@@ -194,39 +305,41 @@ class DBConnection:
         return self.__engine
 
     def __create_engine(self):
-        self._logger.info(f"Creating connection to {self.config.host} on {self.config.database}...")
+        cfg = self.config
+        drv, usr, pwd, host, db, port, qry = (
+            cfg.delicate, cfg.username, cfg.password, cfg.host, cfg.database, cfg.port, cfg.query
+        )
+        self._logger.info(f"Creating connection to {host} on {db}...")
         try:
-            conn_url = sqlalchemy.engine.url.URL(
-                drivername=self.config.delicate,
-                username=self.config.username,
-                password=self.config.password,
-                host=self.config.host,
-                database=self.config.database,
-                port=self.config.port,
-                query=self.config.query,
+            conn_url = sqlalchemy.engine.url.URL.create(
+                drivername=drv,
+                username=usr,
+                password=pwd,
+                host=host,
+                database=db,
+                port=port,
+                query=qry,
             )
         except Exception as e:
-            try:
-                conn_url = sqlalchemy.engine.url.URL.create(
-                    drivername=self.config.delicate,
-                    username=self.config.username,
-                    password=self.config.password,
-                    host=self.config.host,
-                    database=self.config.database,
-                    port=self.config.port,
-                    query=self.config.query,
-                )
-            except Exception as e:
-                self._logger.error(f"Failed to build a URI for the Database.")
-                raise e
+            self._logger.error(f"Failed to build a URI for the Database.")
+            raise e
 
         self._logger.info(f'Connection URI is: {conn_url}')
 
         try:
-            self.__engine = create_engine(conn_url, echo=self.config.echo)
-            if self.config.stream:
-                self.engine.connect().execution_options(stream_results=self.config.stream)
+            self.__engine_key, self.__engine = _acquire_engine(
+                conn_url,
+                echo=cfg.echo,
+                pool_size=cfg.pool_size,
+                max_overflow=cfg.max_overflow,
+                pool_recycle=cfg.pool_recycle,
+                pool_pre_ping=cfg.pool_pre_ping,
+            )
+            if cfg.stream:
+                self.__engine = self.__engine.execution_options(stream_results=cfg.stream)
             self._logger.info(f'Database [{self.engine.url.database}] session created...')
+            if cfg.warm_pool:
+                self.warm_pool()
         except sqlalchemy.exc.SQLAlchemyError as e:
             self._logger.error(f"Failed to create engine due database error: {e}")
             raise e
@@ -234,22 +347,57 @@ class DBConnection:
             self._logger.error(f"Failed to create engine due unknown error: {e}")
             raise e
 
-    def schemas(self):
+    def warm_pool(self, n: Optional[int] = None):
+        """
+        Open pool connections ahead of time so the first queries do not pay the connect handshake.
+
+        :param n: Number of connections to open concurrently, defaults to the configured pool size.
+        """
+        n = n or self.config.pool_size
+        self._logger.info(f'Warming up {n} connections in the pool...')
+
+        def ping():
+            with self.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+
         try:
-            schemas = self.inspector.get_schema_names()
-            df = pd.DataFrame(schemas, columns=['schema name'])
-            self._logger.info(f"Number of schemas: {df.shape[0]}")
-            return df
+            with concurrent.futures.ThreadPoolExecutor(max_workers=n) as executor:
+                futures = [executor.submit(ping) for _ in range(n)]
+                for future in concurrent.futures.as_completed(futures):
+                    future.result()
+            self._logger.info('<> Connection pool warmed up successfully <>')
+        except sqlalchemy.exc.SQLAlchemyError as e:
+            self._logger.warning(f"Failed to warm up the connection pool: {e}")
+
+    @contextlib.contextmanager
+    def connection(self, conn=None):
+        """
+        Provide a connection context, reusing the given connection when one is passed.
+
+        :param conn: Optional open connection to reuse instead of checking out a new one.
+        """
+        if conn is not None:
+            yield conn
+        else:
+            with self.engine.connect() as conn:
+                yield conn
+
+    def schemas(self, conn=None):
+        try:
+            inspector = self.inspector if conn is None else inspect(conn)
+            schemas = inspector.get_schema_names()
+            self._logger.info(f"Number of schemas: {len(schemas)}")
+            return schemas
         except sqlalchemy.exc.SQLAlchemyError as e:
             self._logger.error(f"Error retrieving schemas: {e}")
             raise
 
-    def tables(self, schema: str):
+    def tables(self, schema: str, conn=None):
         try:
-            tables = self.inspector.get_table_names(schema=schema)
-            df = pd.DataFrame(tables, columns=['table name'])
-            self._logger.info(f"Number of tables: {df.shape[0]}")
-            return df
+            inspector = self.inspector if conn is None else inspect(conn)
+            tables = inspector.get_table_names(schema=schema)
+            self._logger.info(f"Number of tables: {len(tables)}")
+            return tables
         except sqlalchemy.exc.SQLAlchemyError as e:
             self._logger.error(f"Error retrieving tables from schema {schema}: {e}")
             raise e
@@ -259,17 +407,53 @@ class DBConnection:
         Executes a SQL select query with optional parameterization.
 
         :param query: SQL query string.
-        :param params: Optional dictionary of parameters to be used in the query.
+        :param params: Optional dictionary of parameters to be bound to the query, referenced as :name.
         :param chunk_size: Number of rows per chunk to return for large queries.
-        :return: DataFrame containing the result set.
+        :return: DataFrame containing the result set, or an iterator of DataFrames when chunk_size is set.
         """
         self._logger.info(f'Executing \n{query}\n in progress...')
         try:
             query_df = pd.read_sql(
-                query, self.engine, params=params, chunksize=chunk_size
-            ).convert_dtypes(convert_string=False)
+                text(query), self.engine, params=params, chunksize=chunk_size
+            )
+            self._logger.info('<> Query Successful <>')
+            return query_df if chunk_size else query_df.convert_dtypes(convert_string=False)
+        except Exception as e:
+            self._logger.error(f'Unable to read SQL query: {e}')
+            raise e
+
+    def select_rows(self, query: str, params: Optional[dict] = None) -> list:
+        """
+        Executes a SQL select query and returns the raw rows without building a DataFrame.
+
+        :param query: SQL query string.
+        :param params: Optional dictionary of parameters to be used in the query.
+        :return: List of result rows.
+        """
+        self._logger.info(f'Executing \n{query}\n in progress...')
+        try:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text(query), params or {}).fetchall()
             self._logger.info('<> Query Successful <>')
-            return query_df
+            return rows
+        except Exception as e:
+            self._logger.error(f'Unable to read SQL query: {e}')
+            raise e
+
+    def select_scalar(self, query: str, params: Optional[dict] = None):
+        """
+        Executes a SQL select query and returns the first column of the first row, e.g. for counts.
+
+        :param query: SQL query string.
+        :param params: Optional dictionary of parameters to be bound to the query, referenced as :name.
+        :return: The scalar value, or None if the query returned no rows.
+        """
+        self._logger.info(f'Executing \n{query}\n in progress...')
+        try:
+            with self.engine.connect() as conn:
+                value = conn.execute(text(query), params or {}).scalar()
+            self._logger.info('<> Query Successful <>')
+            return value
         except Exception as e:
             self._logger.error(f'Unable to read SQL query: {e}')
             raise e
@@ -297,11 +481,19 @@ class DBConnection:
             self._logger.error(f"Error inserting data into table {table}: {e}")
             raise e
 
-    def execute(self, sql: str):
+    def execute(self, sql: str, params: Optional[dict] = None):
+        """
+        Executes a SQL statement with optional bound parameters and commits it.
+
+        :param sql: SQL statement string, parameters are referenced as :name.
+        :param params: Optional dictionary of parameters to be bound to the statement.
+        :return: The result of the execution, or False on a database error.
+        """
         self._logger.info(f'Executing {sql} in progress...')
         try:
             with self.engine.connect() as conn:
-                res = conn.execute(text(sql))
+                res = conn.execute(text(sql), params or {})
+                conn.commit()
             self._logger.info(f'<> Run SQL done Successful <>')
             return res
 
@@ -311,7 +503,11 @@ class DBConnection:
 
     def close(self):
         if self.__engine:
-            self.engine.dispose()
+            # The engine may be shared with other connections, the pool is disposed only by its last user
+            _release_engine(self.__engine_key)
+            self.__engine = None
+            self.__engine_key = None
+            self.__inspector = None
             self._logger.info('<> Connection Closed Successfully <>')
 
 
@@ -324,8 +520,9 @@ class DynamicTableGenerator:
         :param logger: logger instance.
         """
         self.__connection = connection
-        self.__base = declarative_base(cls=utils.Model)
-        self.__session = sessionmaker(bind=self.__connection.engine)()
+        self.__base = None
+        self.__session = None
+        self.__schema_cache: dict[str, bool] = {}
         self._logger = logger
 
     @property
@@ -344,25 +541,38 @@ class DynamicTableGenerator:
         #     finally:
         #         session.close()
 
+        if self.__session is None:
+            # Objects stay readable after commit without reloading them from the database.
+            self.__session = sessionmaker(bind=self.__connection.engine, expire_on_commit=False)()
         return self.__session
 
-    def schema_exists(self, schema: str) -> bool:
-        """Check if a schema exists in the database."""
-        with self.__connection.engine.connect() as conn:
-            return conn.dialect.has_schema(conn, schema)
-
-    def create_schema(self, schema: str):
+    @property
+    def base(self):
+        if self.__base is None:
+            self.__base = declarative_base(cls=utils.Model)
+        return self.__base
+
+    def schema_exists(self, schema: str, conn=None) -> bool:
+        """Check if a schema exists in the database, the answer is cached per schema."""
+        if schema not in self.__schema_cache:
+            with self.__connection.connection(conn) as conn:
+                self.__schema_cache[schema] = conn.dialect.has_schema(conn, schema)
+        return self.__schema_cache[schema]
+
+    def create_schema(self, schema: str, conn=None):
         """
         Create a database schema if it does not exist.
 
         :param schema: Name of the schema
+        :param conn: Optional open connection to reuse.
         """
-        if not self.schema_exists(schema):
+        if not self.schema_exists(schema, conn=conn):
             try:
                 self._logger.info(f"Attempt to create schema '{schema}'.")
-                with self.__connection.engine.connect() as conn:
+                with self.__connection.connection(conn) as conn:
                     conn.execute(CreateSchema(schema))
                     conn.commit()
+                self.__schema_cache[schema] = True
                 self._logger.info(f"Schema '{schema}' created successfully.")
                 return True
             except Exception as e:
@@ -380,6 +590,7 @@ class DynamicTableGenerator:
                 with self.__connection.engine.connect() as conn:
                     conn.execute(DropSchema(schema))
                     conn.commit()
+                self.__schema_cache[schema] = False
                 self._logger.info(f"Schema '{schema}' dropped successfully.")
                 return True
             except Exception as e:
@@ -389,13 +600,14 @@ class DynamicTableGenerator:
             self._logger.info(f"Schema '{schema}' does not exists.")
             return True
 
-    def create_table_class(self, name: str, columns: dict, schema: str):
+    def create_table_class(self, name: str, columns: dict, schema: str, conn=None):
         """
         Create a SQLAlchemy table class dynamically.
 
         :param name: Name of the table
         :param columns: Dictionary of column names and their types
         :param schema: Schema name where the table will be created
+        :param conn: Optional open connection to reuse.
         :return: Table class
         """
         self._logger.info(f"Initiating the table '{name}' class.")
@@ -410,27 +622,31 @@ class DynamicTableGenerator:
         self._logger.info(f"'{name.capitalize()}' class created.")
 
         try:
-            self.create_schema(schema)
-            return type(name, (self.__base,), attrs)
+            self.create_schema(schema, conn=conn)
+            return type(name, (self.base,), attrs)
         except Exception as e:
             self._logger.error(f"Error creating table class {name}: {e}")
             raise
 
-    def create_tables(self):
+    def create_tables(self, conn=None):
         """
         Create all tables in the database.
+
+        :param conn: Optional open connection to reuse.
         """
         try:
             self._logger.info(f"Attempt to create all provided tables.")
-            self.__base.metadata.create_all(self.__connection.engine)
+            with self.__connection.connection(conn) as conn:
+                self.base.metadata.create_all(conn)
+                conn.commit()
         except Exception as e:
             self._logger.error(f"Error creating tables: {e}")
             raise e
 
-    def get_table_metadata(self, table: str, schema: str = None) -> dict:
+    def get_table_metadata(self, table: str, schema: str = None, conn=None) -> dict:
         """Retrieve metadata for a specified table."""
         try:
-            with self.__connection.engine.connect() as conn:
+            with self.__connection.connection(conn) as conn:
                 inspector = inspect(conn)
                 return inspector.get_columns(table, schema=schema)
         except Exception as e:
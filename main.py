@@ -16,23 +16,26 @@ logger = MultipurposeLogger(
     name='HDFSRetention'
 )
 today = datetime.now()
+today_ymd_str = today.strftime('%Y%m%d')
+today_ymd_int = int(today_ymd_str)
 RemoveOnlyBefore = "RemoveOnlyBefore"
+system_info = f"OS: {sys.platform}, CPU: {int(psutil.cpu_count())}, Memory: {int(psutil.virtual_memory().total)}"
 
 
 def calculate_audits():
     try:
-        process = psutil.Process()
+        parent = psutil.Process().parent()
         calculated_once = {
             'start_time': today,
-            'tbl_dt': int(today.strftime('%Y%m%d')),
+            'tbl_dt': today_ymd_int,
             'log_file': logger.get_log_file(),
             'config_file': args.config,
             'feed': None,
-            'pid': int(process.parent().pid),
-            'puser': process.parent().username(),
+            'pid': int(parent.pid),
+            'puser': parent.username(),
             'ppid': int(os.getpid()),
             'ppuser': os.getlogin(),
-            'system': f"OS: {sys.platform}, CPU: {int(psutil.cpu_count())}, Memory: {int(psutil.virtual_memory().total)}",
+            'system': system_info,
             'node': socket.gethostbyname(socket.gethostname()),
             'end_time': None,
             'removed_partitioned_count': None,
@@ -81,38 +84,32 @@ def validate_feeds_config(config: dict):
         logger.info(f"Validating the provided data config for '{args.feed}' feed.")
         config = {args.feed: config[args.feed]}
 
-    # Identify feeds with missing details
-    keys_to_remove = []
+    required = ("Schema", "TableName", "RetentionPeriodInDays", "PartitionedBy")
+    valid = {}
+    cutoffs = {}  # feeds commonly share a retention period, compute each cutoff date once
     for key, value in config.items():
-        for field in ["Schema", "TableName", "RetentionPeriodInDays", "PartitionedBy"]:
-            if utils.is_dict_field_missing(value, field):
-                logger.error(f"{field} is empty or None for the '{key}' feed... dropping the feed from the run.")
-                keys_to_remove.append(key)
-                break  # No need to check further fields if one is missing
-        if utils.is_dict_field_missing(value, "Schema"):
-            logger.warning(f"'Schema' is empty or None for the '{key}' "
-                           f"feed... This run will pass if the table is fund in the database.")
-        if value["RetentionPeriodInDays"] == 0 or not isinstance(value["RetentionPeriodInDays"], int):
+        missing = next((field for field in required if utils.is_dict_field_missing(value, field)), None)
+        if missing:
+            logger.error(f"{missing} is empty or None for the '{key}' feed... dropping the feed from the run.")
+            continue
+        retention = value["RetentionPeriodInDays"]
+        if not isinstance(retention, int) or retention <= 0:
             logger.error(
-                f"'RetentionPeriodInDays' equals to '0' or is not integer for the feed '{key}'... "
+                f"'RetentionPeriodInDays' is less than '1' or is not integer for the feed '{key}'... "
                 f"dropping this path from the list.\n"
                 f"Allowed Minimum value for this field is '1'."
             )
-            keys_to_remove.append(key)
             continue
-        config[key][RemoveOnlyBefore] = int(
-            (today - timedelta(days=value["RetentionPeriodInDays"] - 1)).strftime('%Y%m%d')
-        )
-
-    # Remove feeds with missing details
-    for key in keys_to_remove:
-        config.pop(key)
+        if retention not in cutoffs:
+            cutoffs[retention] = int((today - timedelta(days=retention - 1)).strftime('%Y%m%d'))
+        value[RemoveOnlyBefore] = cutoffs[retention]
+        valid[key] = value
 
-    if not config:
+    if not valid:
         return False
 
-    logger.info(f"Config after validation: {config}.")
-    return config.copy()
+    logger.info(f"Config after validation: {valid}.")
+    return valid
 
 
 def validate_configs(config: dict):
@@ -153,6 +150,11 @@ def main():
         query=config['database']['query'],
         stream=config['database']['stream'],
         echo=config['database']['echo'],
+        pool_size=config['database'].get('pool_size', 5),
+        max_overflow=config['database'].get('max_overflow', 10),
+        pool_recycle=config['database'].get('pool_recycle', 300),
+        pool_pre_ping=config['database'].get('pool_pre_ping', True),
+        warm_pool=config['database'].get('warm_pool', False),
     )
 
     logger.info(f"Initiating Audit DBConfig.")
@@ -167,6 +169,11 @@ def main():
         query=config['audit']['query'],
         stream=config['audit']['stream'],
         echo=config['audit']['echo'],
+        pool_size=config['audit'].get('pool_size', 5),
+        max_overflow=config['audit'].get('max_overflow', 10),
+        pool_recycle=config['audit'].get('pool_recycle', 300),
+        pool_pre_ping=config['audit'].get('pool_pre_ping', True),
+        warm_pool=config['audit'].get('warm_pool', False),
     )
 
     logger.info(f"Config before start removal: {config}")
@@ -186,94 +193,98 @@ def main():
     generator = DynamicTableGenerator(
         audit_dbconnection, logger=logger
     )
-    # STEP HEER IS VERY IMPORTANT, THE VARIABLE HERE IS A CLASS NOT OBJECT
-    AuditTableClass = generator.create_table_class(
-        name=config['audit']['table'],
-        columns=get_table_structure(),
-        schema=config['audit']['schema']
-    )
-    generator.create_tables()
+    with audit_dbconnection.connection() as conn:
+        # STEP HEER IS VERY IMPORTANT, THE VARIABLE HERE IS A CLASS NOT OBJECT
+        AuditTableClass = generator.create_table_class(
+            name=config['audit']['table'],
+            columns=get_table_structure(),
+            schema=config['audit']['schema'],
+            conn=conn
+        )
+        generator.create_tables(conn=conn)
 
-    for feed, values in config['data'].items():
-        audits = AuditTableClass(**calculate_audits())
-        audits.all_removed_before = values[RemoveOnlyBefore]
-        audits.feed = feed
+    base_audits = calculate_audits()
+    audits_list = []
+    try:
+        for feed, values in config['data'].items():
+            audits_row = dict(base_audits)
+            audits_row['feed'] = feed
+            cutoff = values[RemoveOnlyBefore]
+            audits_row['all_removed_before'] = cutoff
+            audits = AuditTableClass(**audits_row)
+            audits_list.append(audits)
+
+            # TODO: below is a hive statement, does it actually drop?, as we are executing on presto
+            # TODO: we can convert it into a terminal command aligned with hive
+            sql = f""" 
+                ALTER TABLE {values['Schema']}.{values['TableName']}
+                DROP IF EXISTS PARTITION(
+                    {values['PartitionedBy']} < {cutoff}
+                )
+            """
+            try:
+                rows = dbconnection.select_rows(f"""
+                    SELECT 
+                        distinct {values['PartitionedBy']}
+                    from 
+                        {values['Schema']}.{values['TableName']}
+                    where 
+                        {values['PartitionedBy']} < :cutoff
+                """, params={'cutoff': cutoff})
+                partitions = [row[0] for row in rows]
+                audits.removed_partitioned_count = len(partitions)
+                logger.info(f"total number of partitions to remove: {audits.removed_partitioned_count}")
+                audits.list_of_removed_dates_in_this_run = repr(sorted(map(str, partitions)))
+                logger.info(f"list of partitions to remove: {audits.list_of_removed_dates_in_this_run}")
+
+                if args.test:
+                    logger.info(f"Test run will execute: {sql}")
+                    res = True
+                else:
+                    res = dbconnection.execute(sql)
+
+                if res:
+                    logger.info(
+                        f'Dropping the requested partitions before {cutoff} '
+                        f'was done successfully for {feed}.'
+                    )
+                    audits.alter_status = 'success'
+                else:
+                    logger.error(f'Error: Failed dropping the requested partitions.')
+                    audits.alter_status = 'failed'
+                    continue
+                audits.run_status = 'success'
+            except Exception as e:
+                logger.error(f"Failed for unknown error {e}")
+                audits.run_status = 'failed'
+                raise e
+            finally:
+                audits.end_time = datetime.now()
+    finally:
+        # All the audits rows are written in one flush and commit at the end of the run.
         try:
-            generator.session.add(audits)
+            generator.session.add_all(audits_list)
             generator.session.commit()
         except Exception as e:
             generator.session.rollback()
-            logger.error(f'Failed to insert audits {audits} into the database for {feed}: {e}')
-            raise e
-
-        # TODO: below is a hive statement, does it actually drop?, as we are executing on presto
-        # TODO: we can convert it into a terminal command aligned with hive
-        sql = f""" 
-            ALTER TABLE {values['Schema']}.{values['TableName']}
-            DROP IF EXISTS PARTITION(
-                {values['PartitionedBy']} < {values[RemoveOnlyBefore]}
-            )
-        """
-        try:
-            df = dbconnection.select(f"""
-                SELECT 
-                    distinct {values['PartitionedBy']}
-                from 
-                    {values['Schema']}.{values['TableName']}
-                where 
-                    {values['PartitionedBy']} < {values[RemoveOnlyBefore]}
-            """)
-            df.info()
-            audits.removed_partitioned_count = df.shape[0]
-            logger.info(f"total number of partitions to remove: {audits.removed_partitioned_count}")
-            audits.list_of_removed_dates_in_this_run = df[values['PartitionedBy']].sort_values().astype(
-                str).values.tolist().__str__()
-            logger.info(f"list of partitions to remove: {audits.list_of_removed_dates_in_this_run}")
-
-            if args.test:
-                logger.info(f"Test run will execute: {sql}")
-                res = True
-            else:
-                res = dbconnection.execute(sql)
-
-            if res:
-                logger.info(
-                    f'Dropping the requested partitions before {values[RemoveOnlyBefore]} '
-                    f'was done successfully for {feed}.'
-                )
-                audits.alter_status = 'success'
-            else:
-                logger.error(f'Error: Failed dropping the requested partitions.')
-                audits.alter_status = 'failed'
-                continue
-            audits.run_status = 'success'
-        except Exception as e:
-            logger.error(f"Failed for unknown error {e}")
-            audits.run_status = 'failed'
+            logger.error(f'Failed to insert audits {audits_list} into the database: {e}')
             raise e
-        finally:
-            audits.end_time = datetime.now()
-            try:
-                generator.session.commit()
-            except Exception as e:
-                generator.session.rollback()
-                logger.error(f'Failed to insert audits {audits} into the database for {feed}: {e}')
-                raise e
 
     dbconnection.close()
     audit_dbconnection.close()
     executor.close()
+    sshconfig.close()
 
     logger.info(f"Reading the email template message.")
     try:
         with open(config['email']['template'], 'tr') as file:
             data = file.read().format(
-                feed=args.feed, date=today.strftime('%Y%m%d'), status=audits.run_status
+                feed=args.feed, date=today_ymd_str, status=audits.run_status
             )
         logger.info(f"Reading the email template message.")
     except FileNotFoundError as e:
         logger.error(f"File {config['email']['template']} not found: {e}")
-        data = f"Email of Automated retention {today.strftime('%Y%m%d')} with status {audits.run_status}"
+        data = f"Email of Automated retention {today_ymd_str} with status {audits.run_status}"
 
     try:
         email_config = EmailConfig(
@@ -290,12 +301,13 @@ def main():
             'attachments']
         sender.send_email(
             subject=config['email']['subject'].format(
-                feed=args.feed, date=today.strftime('%Y%m%d'), status=audits.run_status
+                feed=args.feed, date=today_ymd_str, status=audits.run_status
             ),
             body=data,
             receivers=config['email']['recipients'],
             attachments=attachments
         )
+        email_config.close()
     except Exception as e:
         logger.error(f"Could not send email due known reason: {e}")
 
@@ -1,20 +1,43 @@
-import json
+import asyncio
+import base64
+import concurrent.futures
+import contextlib
+import os
 import smtplib
+import threading
+import time
+from email.mime.base import MIMEBase
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email.mime.application import MIMEApplication
+from types import MappingProxyType
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 import utils
 
+ATTACHMENT_CHUNK_SIZE = 57 * 1024
+
+
+class EmailConfig(utils.ConfigModel):
+    _SECRET_FIELDS = ('password',)
 
-class EmailConfig(utils.Model):
     def __init__(self, username, password, server='smtp.gmail.com', port=587, default_sender=None):
         self.__server = server
         self.__port = port
         self.__username = username
-        self.__password = password
+        self.__password = utils.to_secret(password)
         self.__default_sender = default_sender
 
     @property
@@ -55,13 +78,13 @@ class EmailConfig(utils.Model):
 
     @property
     def password(self):
-        return self.__password
+        return utils.from_secret(self.__password)
 
     @password.setter
     def password(self, password):
         if password is not None and not isinstance(password, str):
             raise ValueError("Password must be a string or None.")
-        self.__password = password
+        self.__password = utils.to_secret(password)
 
     @property
     def default_sender(self):
@@ -73,89 +96,287 @@ class EmailConfig(utils.Model):
             raise ValueError("Default sender must be a string or None.")
         self.__default_sender = default_sender
 
-    # Update method for dynamic configuration
-    def update_config(self, **kwargs):
-        for key, value in kwargs.items():
-            setter_method = f"{key}"
-            if hasattr(self, setter_method):
-                try:
-                    getattr(self, setter_method)(value)
-                except Exception as e:
-                    raise ValueError(f"Error setting {key}: {str(e)}")
-            else:
-                raise KeyError(f"Invalid configuration key: {key}")
+    def close(self):
+        """Wipe the password from memory, the config can not authenticate afterwards."""
+        utils.wipe_secret(self.__password)
+        self.__password = None
 
 
 class MultiPurposeEmailSender:
-    def __init__(self, config: EmailConfig, logger):
+    def __init__(self, config: EmailConfig, logger, keepalive: int = 100):
+        """
+        :param config: EmailConfig instance.
+        :param logger: logger instance.
+        :param keepalive: Seconds an idle SMTP connection is reused before it is checked with NOOP.
+        """
         self.__config = config
         self._logger = logger
+        self._keepalive = keepalive
+        self._smtp = None
+        self._smtp_last_used = None
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc, exc_tb):
+        self.close()
+
+    def connect(self):
+        self._logger.info(f"Starting the SMTP server {self.__config.server}:{self.__config.port}.")
+        smtp = smtplib.SMTP(self.__config.server, self.__config.port)
+        try:
+            smtp.starttls()
+            self._logger.info(f"Logging into the email {self.__config.username}.")
+            smtp.login(self.__config.username, self.__config.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._smtp_last_used = time.monotonic()
+
+    def close(self):
+        if self._smtp:
+            try:
+                self._smtp.quit()
+            except smtplib.SMTPException:
+                self._smtp.close()
+            finally:
+                self._smtp = None
+                self._logger.info("SMTP connection closed successfully.")
+
+    def _ensure_connected(self):
+        if self._smtp is not None and time.monotonic() - self._smtp_last_used > self._keepalive:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP check failed.")
+            except smtplib.SMTPServerDisconnected:
+                self._logger.warning("Idle SMTP connection is no longer usable, reconnecting...")
+                self._smtp.close()
+                self._smtp = None
+        if self._smtp is None:
+            self.connect()
+
+    def _sendmail(self, receivers, payload: bytes):
+        self._ensure_connected()
+        try:
+            self._smtp.sendmail(self.__config.username, receivers, payload)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+            if isinstance(e, smtplib.SMTPResponseException) and e.smtp_code != 421:
+                raise
+            # The server dropped the connection (or answered 421), reconnect and retry once.
+            self._logger.warning(f"SMTP connection was closed by the server, reconnecting: {e}")
+            self._smtp.close()
+            self.connect()
+            self._smtp.sendmail(self.__config.username, receivers, payload)
+        self._smtp_last_used = time.monotonic()
 
     def send_email(self, subject, body, receivers, attachments=None, inline_attachments=None):
         msg = self._create_message(subject, body, receivers, attachments, inline_attachments)
+        opened_here = self._smtp is None
         try:
-            self._logger.info(f"Starting the SMTP server {self.__config.server}:{self.__config.port}.")
-            with smtplib.SMTP(self.__config.server, self.__config.port) as server:
-                server.starttls()
-                self._logger.info(f"Logging into the email {self.__config.username}.")
-                server.login(self.__config.username, self.__config.password)
-                self._logger.info(f"Sending the email to {receivers}.")
-                server.sendmail(self.__config.username, receivers, msg.as_string())
+            self._logger.info(f"Sending the email to {receivers}.")
+            self._sendmail(receivers, msg.as_bytes(policy=msg.policy.clone(linesep='\r\n')))
             self._logger.info("Email sent successfully!")
         except smtplib.SMTPException as e:
             self._logger.error(f"Error sending email due server issue: {e}")
         except Exception as e:
             self._logger.error(f"Error sending email due unknown issue: {e}")
+        finally:
+            if opened_here:
+                self.close()
+
+    def build_payload(self, subject, body, receivers=None, attachments=None, inline_attachments=None) -> bytes:
+        """
+        Build and serialize a message once, so it can be sent to several recipient sets with send_payload.
+
+        :param receivers: Optional receivers for the To header, leave empty to only address through the envelope.
+        :return: The serialized message.
+        """
+        msg = self._create_message(subject, body, receivers, attachments, inline_attachments)
+        return msg.as_bytes(policy=msg.policy.clone(linesep='\r\n'))
+
+    def send_payload(self, payload: bytes, receivers, batch_size: int = None):
+        """
+        Send an already serialized message, optionally splitting the receivers into batches.
+
+        :param payload: Message bytes from build_payload.
+        :param receivers: List of receivers.
+        :param batch_size: Maximum receivers per SMTP transaction, all at once by default.
+        :return: Number of batches sent successfully.
+        """
+        batch_size = batch_size or len(receivers) or 1
+        sent = 0
+        opened_here = self._smtp is None
+        try:
+            for i in range(0, len(receivers), batch_size):
+                batch = receivers[i:i + batch_size]
+                try:
+                    self._logger.info(f"Sending the email to {batch}.")
+                    self._sendmail(batch, payload)
+                    sent += 1
+                except smtplib.SMTPException as e:
+                    self._logger.error(f"Error sending email due server issue: {e}")
+                except Exception as e:
+                    self._logger.error(f"Error sending email due unknown issue: {e}")
+        finally:
+            if opened_here:
+                self.close()
+        return sent
+
+    def send_many(self, items):
+        """
+        Send several emails over a single SMTP connection.
+
+        :param items: Iterable of dicts holding the send_email keyword arguments.
+        :return: Number of emails sent successfully.
+        """
+        sent = 0
+        opened_here = self._smtp is None
+        try:
+            for item in items:
+                try:
+                    msg = self._create_message(**item)
+                    self._logger.info(f"Sending the email to {item['receivers']}.")
+                    self._sendmail(item['receivers'], msg.as_bytes(policy=msg.policy.clone(linesep='\r\n')))
+                    sent += 1
+                except smtplib.SMTPException as e:
+                    self._logger.error(f"Error sending email due server issue: {e}")
+                except Exception as e:
+                    self._logger.error(f"Error sending email due unknown issue: {e}")
+        finally:
+            if opened_here:
+                self.close()
+        self._logger.info(f"{sent} emails sent successfully!")
+        return sent
 
     def _create_message(self, subject, body, receivers, attachments=None, inline_attachments=None):
-        self._logger.info(f"Start creating the email with subject: {subject}.")
-        msg = MIMEMultipart()
-        msg['From'] = self.__config.username
+        return create_message(
+            self.__config.username, subject, body, receivers, self._logger, attachments, inline_attachments
+        )
+
+
+def create_message(sender, subject, body, receivers, logger, attachments=None, inline_attachments=None):
+    """
+    Build the MIME message shared by the synchronous and the asynchronous email senders.
+
+    Attachment files are read here, asyncio callers should run it in a worker thread.
+    """
+    logger.info(f"Start creating the email with subject: {subject}.")
+    msg = MIMEMultipart()
+    msg['From'] = sender
+    if receivers:
         msg['To'] = ", ".join(receivers)
-        msg['Subject'] = subject
+    msg['Subject'] = subject
 
-        # Attach body as HTML
-        msg.attach(MIMEText(body, 'html'))
+    # Attach body as HTML
+    msg.attach(MIMEText(body, 'html'))
 
-        # Attach files
-        self._attach_files(msg, attachments)
+    # Attach files
+    _attach_files(msg, attachments, logger)
 
-        # Attach inline files
-        self._attach_files(msg, inline_attachments, inline=True)
+    # Attach inline files
+    _attach_files(msg, inline_attachments, logger, inline=True)
 
-        self._logger.info(f"Email with subject: {subject}... created successfully.")
-        return msg
+    logger.info(f"Email with subject: {subject}... created successfully.")
+    return msg
 
-    def _attach_files(self, msg, attachments, inline=False):
-        if attachments:
-            self._logger.info("Adding the attachments to the email.")
-            for attachment in attachments:
-                try:
-                    with open(attachment, "rb") as file:
-                        data = file.read()
-                    part = MIMEApplication(data, Name=attachment)
-                    if not inline:
-                        part['Content-Disposition'] = f'attachment; filename="{attachment}"'
-                    else:
-                        part.add_header('Content-Disposition', 'inline', filename=attachment)
-                    msg.attach(part)
-                    self._logger.info(f"Attachment {attachment} was added successfully.")
-                except Exception as e:
-                    self._logger.error(f"Error attaching file '{attachment}': {e}")
-            self._logger.info("All attachments were added successfully to the email.")
-        else:
-            self._logger.info("Attempt to add attachment without providing any.")
 
+def _attach_files(msg, attachments, logger, inline=False):
+    if attachments:
+        logger.info("Adding the attachments to the email.")
+        for attachment in attachments:
+            try:
+                # Encode in 57 KiB blocks (a multiple of 3 bytes) so the raw file is never fully in memory.
+                with open(attachment, "rb") as file:
+                    data = ''.join(
+                        base64.encodebytes(chunk).decode('ascii')
+                        for chunk in iter(lambda: file.read(ATTACHMENT_CHUNK_SIZE), b'')
+                    )
+                part = MIMEBase('application', 'octet-stream', Name=attachment)
+                part.set_payload(data)
+                part['Content-Transfer-Encoding'] = 'base64'
+                if not inline:
+                    part['Content-Disposition'] = f'attachment; filename="{attachment}"'
+                else:
+                    part.add_header('Content-Disposition', 'inline', filename=attachment)
+                msg.attach(part)
+                logger.info(f"Attachment {attachment} was added successfully.")
+            except Exception as e:
+                logger.error(f"Error attaching file '{attachment}': {e}")
+        logger.info("All attachments were added successfully to the email.")
+    else:
+        logger.info("Attempt to add attachment without providing any.")
+
+
+class AsyncMultiPurposeEmailSender:
+    """
+    Non-blocking counterpart of MultiPurposeEmailSender for asyncio callers, keeping one persistent SMTP connection.
+
+    Use as an async context manager, requires the optional aiosmtplib package.
+    """
+
+    def __init__(self, config: EmailConfig, logger):
+        if aiosmtplib is None:
+            raise ImportError("aiosmtplib is required for AsyncMultiPurposeEmailSender.")
+        self.__config = config
+        self._logger = logger
+        self._smtp = None
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, exc_tb):
+        await self.close()
+
+    async def connect(self):
+        self._logger.info(f"Starting the SMTP server {self.__config.server}:{self.__config.port}.")
+        self._smtp = aiosmtplib.SMTP(hostname=self.__config.server, port=self.__config.port, start_tls=False)
+        await self._smtp.connect()
+        await self._smtp.starttls()
+        self._logger.info(f"Logging into the email {self.__config.username}.")
+        await self._smtp.login(self.__config.username, self.__config.password)
+
+    async def close(self):
+        if self._smtp:
+            try:
+                await self._smtp.quit()
+            except aiosmtplib.SMTPException:
+                self._smtp.close()
+            finally:
+                self._smtp = None
+                self._logger.info("SMTP connection closed successfully.")
+
+    async def send(self, subject, body, receivers, attachments=None, inline_attachments=None):
+        # Reading and encoding the attachments is blocking file I/O, keep it off the event loop
+        msg = await asyncio.to_thread(
+            create_message, self.__config.username, subject, body, receivers, self._logger,
+            attachments, inline_attachments
+        )
+        try:
+            if self._smtp is None or not self._smtp.is_connected:
+                await self.connect()
+            self._logger.info(f"Sending the email to {receivers}.")
+            await self._smtp.send_message(msg, sender=self.__config.username, recipients=receivers)
+            self._logger.info("Email sent successfully!")
+        except aiosmtplib.SMTPException as e:
+            self._logger.error(f"Error sending email due server issue: {e}")
+        except Exception as e:
+            self._logger.error(f"Error sending email due unknown issue: {e}")
+
+
+class WCConfig(utils.ConfigModel):
+    _SECRET_FIELDS = ('token',)
 
-class WCConfig:
     def __init__(self, url, token, proxies=None):
         self.__url = url
-        self.__token = token
-        self.__proxies = proxies
+        self.__token = utils.to_secret(token)
+        self.__proxies = MappingProxyType(dict(proxies) if proxies else {})
 
     @property
     def token(self):
-        return self.__token
+        return utils.from_secret(self.__token)
 
     @token.setter
     def token(self, token):
@@ -163,7 +384,7 @@ class WCConfig:
             raise ValueError("URL can not be empty or None.")
         if not isinstance(token, str):
             raise ValueError("URL must be a string.")
-        self.__token = token
+        self.__token = utils.to_secret(token)
 
     @property
     def url(self):
@@ -179,61 +400,80 @@ class WCConfig:
 
     @property
     def proxies(self):
-        if self.__proxies:
-            return self.__proxies.copy()
-        return {}
+        # Read-only view, callers can not mutate the config through it.
+        return self.__proxies
 
     @proxies.setter
     def proxies(self, proxies):
         # You can customize the validation for proxies as needed
         if proxies is not None and not isinstance(proxies, dict):
             raise ValueError("Proxies must be a dictionary or None.")
-        self.__proxies = proxies.copy()
-
-    # Update method for dynamic configuration
-    def update_config(self, **kwargs):
-        for key, value in kwargs.items():
-            setter_method = f"set_{key}"
-            if hasattr(self, setter_method):
-                try:
-                    getattr(self, setter_method)(value)
-                except Exception as e:
-                    raise ValueError(f"Error setting {key}: {str(e)}")
-            else:
-                raise KeyError(f"Invalid configuration key: {key}")
+        self.__proxies = MappingProxyType(dict(proxies) if proxies else {})
 
     # Setters for dynamic configuration updates
     def set_url(self, url):
-        self.__url = url
+        self.url = url
 
-    def set_token(self, url):
-        self.__token = url
+    def set_token(self, token):
+        self.token = token
 
     def set_proxies(self, proxies):
-        self.__proxies = proxies.copy()
+        self.proxies = proxies
+
+    def close(self):
+        """Wipe the token from memory, the config can not authenticate afterwards."""
+        utils.wipe_secret(self.__token)
+        self.__token = None
 
 
 class WCSender:
-    def __init__(self, config: WCConfig, logger):
+    def __init__(self, config: WCConfig, logger, pool_connections: int = 10, pool_maxsize: int = 20,
+                 max_concurrent_attachments: int = 4):
         self.__config = config
         self._logger = logger
+        self._pool_maxsize = pool_maxsize
+        # Caps how many messages hold their attachment files open at once in send_many.
+        self._attachments_semaphore = threading.BoundedSemaphore(max_concurrent_attachments)
+
+        # One pooled session so consecutive messages reuse the same keep-alive connection.
+        self._session = requests.Session()
+        self._session.proxies.update(self.__config.proxies)
+        self._session.headers.update({'Content-type': 'application/json'})
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            # Only failed connects are retried, POST is not idempotent so a 5xx is never resent as a duplicate message
+            max_retries=Retry(total=3, backoff_factor=0.2),
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def close(self):
+        self._session.close()
 
     def send_message(self, thread_keys: str, message: str, files: list = None, headers: dict = None):
-        if headers is None:
-            headers = {'Content-type': 'application/json'}
         try:
             message_body = {"recipient": {"thread_key": thread_keys}, "message": {"text": message}}
 
-            # Add file attachments if provided
-            if files:
-                message_body['message']['attachment'] = self._attach_files(files)
-
-            r = requests.post(
-                url=f"{self.__config.url}{self.__config.token}",
-                data=json.dumps(message_body),
-                headers=headers,
-                proxies=self.__config.proxies
-            )
+            with contextlib.ExitStack() as stack:
+                # Add file attachments if provided, they are sent as multipart file fields read from open handles
+                if files:
+                    stack.enter_context(self._attachments_semaphore)
+                    message_body['message']['attachment'] = {"type": "file", "payload": {}}
+                    r = self._session.post(
+                        url=f"{self.__config.url}{self.__config.token}",
+                        data={key: utils.dumps_json(value) for key, value in message_body.items()},
+                        files=self._attach_files(files, stack),
+                        headers={'Content-type': None, **(headers or {})},
+                        timeout=(3.05, 30),
+                    )
+                else:
+                    r = self._session.post(
+                        url=f"{self.__config.url}{self.__config.token}",
+                        data=utils.dumps_json(message_body),
+                        headers=headers,
+                        timeout=(3.05, 30),
+                    )
 
             r.raise_for_status()  # Raise HTTPError for bad responses
 
@@ -248,22 +488,95 @@ class WCSender:
         except Exception as e:
             self._logger.error(f"An unexpected error occurred during the execution of send_message:{e}", )
 
-    def _attach_files(self, files):
+    def send_many(self, items, max_workers: int = None):
+        """
+        Send several messages concurrently over the pooled session.
+
+        :param items: Iterable of dicts holding the send_message keyword arguments.
+        :param max_workers: Number of concurrent requests, defaults to the connection pool size.
+        :return: List of responses in the order of items, None for the messages that failed.
+        """
+        max_workers = min(max_workers or self._pool_maxsize, self._pool_maxsize)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            responses = list(executor.map(self._post_one, items))
+        failed = sum(response is None for response in responses)
+        if failed:
+            self._logger.error(f"{failed} of {len(responses)} WC messages failed to send.")
+        else:
+            self._logger.info(f"All {len(responses)} WC messages were sent successfully.")
+        return responses
+
+    def _post_one(self, item):
+        # send_message logs its own failures and returns None, so one bad item does not abort the batch
+        return self.send_message(**item)
+
+    def _attach_files(self, files, stack: contextlib.ExitStack):
         # Handle file attachments if needed (customize as per your requirements)
-        # This method can be extended to support different types of attachments
+        # The files are handed to requests as open handles, they are closed when the stack exits
         attachments = []
         self._logger.info("Adding the attachments to the email.")
         for file_path in files:
 
             try:
-                with open(file_path, 'rb') as file:
-                    file_data = file.read()
-                file_name = file_path.split('/')[-1]  # Extracting file name from path
-                attachments.append({"type": "file", "name": file_name, "content": file_data})
-                self._logger.info(f"Attachment {file_path} was added successfully.")
+                file = stack.enter_context(open(file_path, 'rb'))
+                attachments.append(('filedata', (os.path.basename(file_path), file)))
             except FileNotFoundError:
                 self._logger.error(f"Attachment file not found: {file_path}", )
             except Exception as e:
                 self._logger.error(f"Error processing file {file_path}: {e}")
-        self._logger.info("All attachments were added successfully to the message.")
+        self._logger.info(
+            f"Added {len(attachments)} attachments to the message: {[name for _, (name, _) in attachments]}"
+        )
         return attachments
+
+
+class AsyncWCSender:
+    """
+    Non-blocking counterpart of WCSender for asyncio callers, sharing one pooled httpx.AsyncClient.
+
+    Use as an async context manager, requires the optional httpx package. Only text messages are supported.
+    """
+
+    def __init__(self, config: WCConfig, logger, max_connections: int = 100, max_keepalive_connections: int = 20):
+        if httpx is None:
+            raise ImportError("httpx is required for AsyncWCSender.")
+        self.__config = config
+        self._logger = logger
+
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        mounts = {
+            f"{scheme}://": httpx.AsyncHTTPTransport(proxy=httpx.Proxy(proxy), limits=limits)
+            for scheme, proxy in self.__config.proxies.items()
+        }
+        self._client = httpx.AsyncClient(
+            limits=limits,
+            mounts=mounts or None,
+            headers={'Content-type': 'application/json'},
+            timeout=httpx.Timeout(30, connect=3.05),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, exc_tb):
+        await self.close()
+
+    async def close(self):
+        await self._client.aclose()
+
+    async def send_message(self, thread_keys: str, message: str, headers: dict = None):
+        try:
+            message_body = {"recipient": {"thread_key": thread_keys}, "message": {"text": message}}
+            r = await self._client.post(
+                f"{self.__config.url}{self.__config.token}",
+                content=utils.dumps_json(message_body),
+                headers=headers,
+            )
+            r.raise_for_status()
+            return r
+        except httpx.HTTPStatusError as e:
+            self._logger.error(f"HTTP error during the WC request: {e.response.text}", )
+        except httpx.RequestError as e:
+            self._logger.error(f"A network error occurred while sending the WC message: {e}")
+        except Exception as e:
+            self._logger.error(f"An unexpected error occurred during the execution of send_message:{e}", )
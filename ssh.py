@@ -1,16 +1,25 @@
+import functools
+import re
+import select
+import uuid
+
 import paramiko
 from sshtunnel import SSHTunnelForwarder, BaseSSHTunnelForwarderError
 from paramiko.ssh_exception import SSHException, AuthenticationException, NoValidConnectionsError
 import os
 
+import utils
+
+
+class SSHConfig(utils.ConfigModel):
+    _SECRET_FIELDS = ('password',)
 
-class SSHConfig:
     def __init__(self, host=None, port=22, username=None, password=None, auth_key=None):
         self.__host = host
         self.__port = port
         self.__username = username
         self.__auth_key = auth_key
-        self.__password = password
+        self.__password = utils.to_secret(password)
 
     @property
     def host(self):
@@ -58,28 +67,33 @@ class SSHConfig:
 
     @property
     def password(self):
-        return self.__password
+        return utils.from_secret(self.__password)
 
     @password.setter
     def password(self, password):
         if password is not None and not isinstance(password, str):
             raise ValueError("SSH Password must be a string or None.")
-        self.__password = password
+        self.__password = utils.to_secret(password)
+
+    def close(self):
+        """Wipe the password from memory, the config can not authenticate afterwards."""
+        utils.wipe_secret(self.__password)
+        self.__password = None
 
-    # Optional: Add a method to update config using a dictionary
-    def update_config(self, **kwargs):
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-            else:
-                raise KeyError(f"Invalid SSH configuration key: {key}")
+
+@functools.lru_cache(maxsize=8)
+def _load_rsa_key_cached(path, mtime):
+    """Parse a private key once per process, the mtime is part of the key so an edited file is parsed again."""
+    return paramiko.RSAKey.from_private_key_file(path)
 
 
 class SSHTunnelCommandExecutor:
-    def __init__(self, config: SSHConfig, logger):
+    def __init__(self, config: SSHConfig, logger, shell_timeout: float = None):
         self.__config = config
         self.tunnel = None
         self.client = None
+        self._shell = None
+        self._shell_timeout = shell_timeout
         self._logger = logger
 
         self.auth_key = None
@@ -88,7 +102,7 @@ class SSHTunnelCommandExecutor:
     def load_rsa_key(self, key):
         try:
             if self.__config.auth_key:
-                self.auth_key = paramiko.RSAKey.from_private_key_file(key)
+                self.auth_key = _load_rsa_key_cached(key, os.path.getmtime(key))
                 self._logger.info(f"RSA Key created successfully.")
         except Exception as e:
             self._logger.error(f"Error loading authentication file: {e}")
@@ -127,7 +141,7 @@ class SSHTunnelCommandExecutor:
             self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             self._logger.info(f"SSH Client is created")
 
-            if not self.tunnel or self.tunnel.closed:
+            if not self.tunnel or not self.tunnel.is_active:
                 self.open_tunnel()
 
             self.client.connect(
@@ -138,23 +152,103 @@ class SSHTunnelCommandExecutor:
                 pkey=self.auth_key
             )
             self._logger.info(f"SSH Client Connected...")
+            self.open_shell()
         except (AuthenticationException, SSHException, NoValidConnectionsError) as e:
             self._logger.error(f"Error connecting SSH client: {e}")
             raise Exception(f"Error connecting SSH client: {e}")
 
+    def open_shell(self):
+        """Open one persistent shell channel, commands are multiplexed over it instead of a channel per command."""
+        self._shell = self.client.invoke_shell()
+        self._shell.settimeout(self._shell_timeout)
+        # No echo and no prompt, so the channel output is only what the commands print,
+        # no pager or aliases either, so commands do not block on a pty and print like execute_oneshot
+        marker = self._new_marker()
+        try:
+            self._shell.send(f"stty -echo; PS1=''; PS2=''; export TERM=dumb PAGER=cat; unalias -a; echo {marker}$?\n")
+            self._read_until_marker(marker)
+        except Exception:
+            self._close_shell()
+            raise
+        self._logger.info(f"SSH Shell is open...")
+
+    @staticmethod
+    def _new_marker():
+        return f"__END_{uuid.uuid4().hex}__"
+
+    def _read_until_marker(self, marker):
+        pattern = re.compile(rf"{marker}(\d+)\r?\n".encode())
+        buffer = bytearray()
+        start = 0
+        while True:
+            # Only the new tail can hold the marker, a marker split across reads starts at most this far back
+            match = pattern.search(buffer, start)
+            if match:
+                return bytes(buffer[:match.start()]).decode(errors='replace'), int(match.group(1))
+            start = max(0, len(buffer) - len(marker) - 16)
+            data = self._shell.recv(65536)
+            if not data:
+                raise SSHException("SSH shell channel was closed by the server.")
+            buffer += data
+
     def execute(self, command):
+        """
+        Run a command over the persistent shell channel.
+
+        Commands that read from stdin consume the end marker line sent after them and will not return,
+        use execute_oneshot for those.
+
+        :param command: Command to run.
+        :return: (stdout, stderr), the shell runs on a pty so stderr is merged into stdout.
+        """
+        if not self._shell or self._shell.closed:
+            if not self.client:
+                self._logger.error("SSH Client not connected before execution.")
+                raise Exception("SSH Client not connected before execution.")
+            self.open_shell()
+        try:
+            marker = self._new_marker()
+            self._shell.send(f"{command}\necho {marker}$?\n")
+            output, exit_code = self._read_until_marker(marker)
+            if exit_code:
+                self._logger.warning(f"Command exited with status {exit_code}: {command}")
+            return output.replace('\r\n', '\n'), ''
+
+        except Exception as e:
+            # Late output and the marker of this command would leak into the next one, start a fresh shell instead
+            self._close_shell()
+            self._logger.error(f"Error executing command: {e}")
+            raise Exception(f"Error executing command: {e}")
+
+    def _close_shell(self):
+        if self._shell:
+            self._shell.close()
+            self._shell = None
+
+    def execute_oneshot(self, command):
         if not self.client:
             self._logger.error("SSH Client not connected before execution.")
             raise Exception("SSH Client not connected before execution.")
         try:
-            stdin, stdout, stderr = self.client.exec_command(command)
-            return stdout.read().decode(), stderr.read().decode()
+            # Drain stdout and stderr together, reading one after the other hangs once the other buffer fills up
+            chan = self.client.get_transport().open_session()
+            chan.exec_command(command)
+            out, err = bytearray(), bytearray()
+            while not chan.exit_status_ready() or chan.recv_ready() or chan.recv_stderr_ready():
+                select.select([chan], [], [], 1.0)
+                while chan.recv_ready():
+                    out += chan.recv(65536)
+                while chan.recv_stderr_ready():
+                    err += chan.recv_stderr(65536)
+            chan.close()
+            return out.decode(), err.decode()
 
         except SSHException as e:
             self._logger.error(f"Error executing command: {e}")
             raise Exception(f"Error executing command: {e}")
 
     def close(self):
+        self._close_shell()
         if self.client:
             self.client.close()
             self._logger.info(f"Client closed successfully")
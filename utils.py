@@ -1,50 +1,124 @@
+import errno
+import fnmatch
+import functools
 import glob
 import json, os
+import mmap
+import shlex
 import shutil
 import subprocess
 
-from datetime import datetime
+from datetime import date, datetime
 
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from threading import Lock
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+MMAP_MIN_SIZE = 64 * 1024
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
 
 class Singleton(type):
     _instances = {}
     _lock = Lock()
 
     def __call__(cls, *args, **kwargs):
-        with cls._lock:
-            if cls not in cls._instances:
-                cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
+        # Double-checked locking, the lock is only taken until the instance exists
+        if cls not in cls._instances:
+            with cls._lock:
+                if cls not in cls._instances:
+                    cls._instances[cls] = super(Singleton, cls).__call__(*args, **kwargs)
         return cls._instances[cls]
 
 
+@functools.lru_cache(maxsize=None)
+def _public_name(attr):
+    """Strip the name mangling prefix, '_Class__name' becomes 'name'."""
+    if attr.startswith('_') and '__' in attr[1:]:
+        return attr[1:].split('__', 1)[1]
+    return attr
+
+
 class Model:
+    # Fields whose values are masked when the model is printed or iterated
+    _SECRET_FIELDS = ()
+
     def __iter__(self):
         for attr, value in self.__dict__.items():
-            yield attr[attr.rfind('__') + 2:], value
+            name = _public_name(attr)
+            yield name, '***' if value is not None and name in self._SECRET_FIELDS else value
 
     def __str__(self):
         return f"{type(self).__name__}(\n" + ',\n'.join(
-            [f"{attr[attr.rfind('__') + 1:]}={value}" for attr, value in self.__dict__.items()]
+            [f"{name}={value}" for name, value in self]
         ) + "\n)"
 
     def __repr__(self):
         return self.__str__()
 
 
+class ConfigModel(Model):
+    """Model whose properties can be updated dynamically through update_config."""
+    _SETTERS = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve every property setter once per class, so update_config is a single dict lookup per key
+        setters = {}
+        for klass in reversed(cls.__mro__):
+            for name, attr in vars(klass).items():
+                if isinstance(attr, property) and attr.fset is not None:
+                    setters[name] = attr.fset
+        cls._SETTERS = setters
+
+    # Update method for dynamic configuration
+    def update_config(self, **kwargs):
+        for key, value in kwargs.items():
+            setter = self._SETTERS.get(key)
+            if setter is None:
+                raise KeyError(f"Invalid configuration key: {key}")
+            try:
+                setter(self, value)
+            except Exception as e:
+                raise ValueError(f"Error setting {key}: {str(e)}")
+
+
+def to_secret(value):
+    """Keep a secret string as a mutable bytearray, so it can be wiped in place."""
+    return bytearray(value.encode('utf-8')) if value is not None else None
+
+
+def from_secret(secret):
+    return secret.decode('utf-8') if secret is not None else None
+
+
+def wipe_secret(secret):
+    """Overwrite a secret bytearray with zeros in place."""
+    if secret is not None:
+        secret[:] = bytes(len(secret))
+
+
 def is_dict_field_missing(value, field_name):
     """Check if a specific field in a value is None or empty."""
     return value.get(field_name) in [None, "", {}, [], ()]
 
 
-def get_days_between_dates(date1, date2):
-    # Convert the date strings to datetime objects
-    datetime1 = datetime.strptime(date1, "%Y%m%d").date()
-    datetime2 = datetime.strptime(date2, "%Y%m%d").date()
+def _parse_ymd(value):
+    # Slicing a fixed %Y%m%d string is much cheaper than datetime.strptime
+    if len(value) == 8 and value.isdigit():
+        return date(int(value[:4]), int(value[4:6]), int(value[6:8]))
+    # strptime also accepts unpadded forms such as '2024011', keep it for anything else
+    return datetime.strptime(value, "%Y%m%d").date()
+
 
+@functools.lru_cache(maxsize=4096)
+def get_days_between_dates(date1, date2):
     # Calculate the number of days between the two dates
-    num_days = abs((datetime2 - datetime1).days)
+    num_days = abs((_parse_ymd(date2) - _parse_ymd(date1)).days)
     return num_days
 
 
@@ -56,6 +130,16 @@ def find_base_directory():
 
 def load_json_file(path):
     try:
+        # Large files are parsed straight from a memory map, mapping is not worth it for small configs
+        if orjson is not None and os.path.getsize(path) >= MMAP_MIN_SIZE:
+            with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                try:
+                    with memoryview(mm) as view:
+                        return orjson.loads(view)
+                except orjson.JSONDecodeError:
+                    # orjson is stricter than json (e.g. it rejects NaN/Infinity), let json decide
+                    return json.loads(mm[:])
+
         with open(path) as file:
             loaded_dict = json.load(file)
         return loaded_dict
@@ -67,10 +151,20 @@ def load_json_file(path):
         raise e
 
 
-def run_terminal_command(command):
+def run_terminal_command(command, *, shell=False, start_new_session=False):
+    """
+    Run a command and return its exit code.
+
+    The command is executed directly without an intermediate /bin/sh unless shell=True,
+    a string command is split with shlex for backward compatibility.
+    """
     try:
+        if isinstance(command, str) and not shell:
+            command = shlex.split(command)
         # Run the command and capture the output
-        result = subprocess.run(command, shell=True, universal_newlines=True, check=False)
+        result = subprocess.run(
+            command, shell=shell, universal_newlines=True, check=False, start_new_session=start_new_session
+        )
         # print('Terminal Command Results:', result)
         # INFO(f'Terminal Command: {result.args} ')
         # INFO(f'Terminal Command Results: {result.returncode} ')
@@ -82,55 +176,156 @@ def run_terminal_command(command):
         raise e
 
 
+def _copy_file(source, destination, override=True):
+    """Copy a file inside the kernel with copy_file_range, falling back to shutil where it is not supported."""
+    flags = os.O_WRONLY | os.O_CREAT | (0 if override else os.O_EXCL)
+    src_fd = os.open(source, os.O_RDONLY)
+    try:
+        # With O_EXCL the existence check and the create are one atomic call, raising FileExistsError
+        dst_fd = os.open(destination, flags, 0o644)
+        try:
+            # Only truncate once we know the destination is not the source itself (or a link to it)
+            src_stat, dst_stat = os.fstat(src_fd), os.fstat(dst_fd)
+            if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+                raise shutil.SameFileError(f"{source!r} and {destination!r} are the same file")
+            os.ftruncate(dst_fd, 0)
+            if hasattr(os, 'copy_file_range'):
+                # st_size is only a hint (procfs, some FUSE and network filesystems misreport it), copy until EOF
+                total = 0
+                while True:
+                    copied = os.copy_file_range(src_fd, dst_fd, max(src_stat.st_size, COPY_CHUNK_SIZE))
+                    if copied == 0:
+                        break
+                    total += copied
+                # Nothing or less than announced went through the kernel, let shutil copy it with plain reads
+                if total > 0 and total >= src_stat.st_size:
+                    return
+        except OSError as e:
+            # e.g. cross-device copies on older kernels, or filesystems without support
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+        finally:
+            os.close(dst_fd)
+        shutil.copyfile(source, destination)
+    finally:
+        os.close(src_fd)
+
+
+def _op_file(source, destination, override=False, operation='copy'):
+    """Copy or move a single file, raising FileExistsError when it exists and override is off."""
+    try:
+        if operation == 'copy':
+            _copy_file(source, destination, override=override)
+        elif operation == 'move':
+            if not override and os.path.exists(destination):
+                raise FileExistsError
+            try:
+                # A rename is metadata only when both paths are on the same filesystem
+                os.rename(source, destination)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                shutil.move(source, destination)
+        else:
+            raise ValueError(f"Invalid operation: {operation}")
+    except FileExistsError:
+        raise FileExistsError(
+            f'The file {destination} already exists int the destination path {os.path.dirname(destination)}.'
+        )
+    return 1
+
+
+def _op_files_in_order(sources, destination, override=False, operation='copy'):
+    """Run every source onto one destination in turn, returning a count or the raised exception per source."""
+    outcomes = []
+    for source in sources:
+        try:
+            outcomes.append(_op_file(source, destination, override, operation))
+        except Exception as e:
+            outcomes.append(e)
+    return outcomes
+
+
 # TODO: this should be moved to become a class instead
-def recursive_op_files(source, destination, source_pattern, override=False, skip_dir=True, operation='copy'):
+def recursive_op_files(source, destination, source_pattern, override=False, skip_dir=True, operation='copy',
+                       max_workers=None):
     files_count = 0
+    # Messages are printed once at the end instead of flushing stdout for every file
+    messages = []
     try:
         assert source is not None, 'Please specify source path, Current source is None.'
         assert destination is not None, 'Please specify destination path, Current source is None.'
 
-        if not os.path.exists(destination):
-            print(f'Creating Dir: {destination}')
-            os.mkdir(destination)
+        # Walk with an explicit stack, scandir gives the entry type without an extra stat per item
+        # A pattern such as 'sub/*.txt' picks the directories to scan, their matches land directly in destination
+        pattern_dir, source_pattern = os.path.split(source_pattern)
+        if pattern_dir:
+            roots = [path for path in sorted(glob.glob(os.path.join(source, pattern_dir))) if os.path.isdir(path)]
+        else:
+            roots = [source]
 
-        items = glob.glob(os.path.join(source, source_pattern))
+        pairs = []
+        # Reversed, so the stack pops roots in glob order and the later root wins on a shared destination
+        stack = [(src_dir, destination) for src_dir in reversed(roots)]
+        while stack:
+            src_dir, dst_dir = stack.pop()
+            os.makedirs(dst_dir, exist_ok=True)
 
-        for item in items:
+            with os.scandir(src_dir) as it:
+                # glob does not match hidden entries unless the pattern asks for them
+                entries = [
+                    entry for entry in it
+                    if fnmatch.fnmatch(entry.name, source_pattern)
+                    and (source_pattern.startswith('.') or not entry.name.startswith('.'))
+                ]
 
-            try:
-                if os.path.isdir(item) and not skip_dir:
-                    path = os.path.join(destination, os.path.basename(item))
-                    # INFO(f'START {operation} FROM {item} TO {path}.')
-                    files_count += recursive_op_files(
-                        source=item, destination=path,
-                        source_pattern=source_pattern, override=override
-                    )
-                else:
-                    file = os.path.join(destination, os.path.basename(item))
-                    print(f'START {operation} FROM {item} TO {file}.')
-                    if not os.path.exists(file) or override:
-                        if operation == 'copy':
-                            shutil.copyfile(item, file)
-                        elif operation == 'move':
-                            shutil.move(item, file)
-                        else:
-                            raise ValueError(f"Invalid operation: {operation}")
-                        files_count += 1
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if not skip_dir:
+                        stack.append((entry.path, os.path.join(dst_dir, entry.name)))
+                    continue
+                pairs.append((entry.path, os.path.join(dst_dir, entry.name)))
+
+        # Sources sharing a destination (e.g. '*/x.bin') must not be written concurrently,
+        # each group runs in order in one task so the last one wins like a sequential loop
+        groups = {}
+        for src, dst in pairs:
+            messages.append(f'START {operation} FROM {src} TO {dst}.')
+            groups.setdefault(dst, []).append(src)
+
+        # Each destination is an independent, latency bound I/O call, so overlap them on a thread pool
+        max_workers = max_workers or max(8, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_op_files_in_order, srcs, dst, override, operation) for dst, srcs in groups.items()]
+
+            for future in as_completed(futures):
+                for outcome in future.result():
+                    if isinstance(outcome, FileNotFoundError):
+                        messages.append(f"File not found error: {outcome}")
+                    elif isinstance(outcome, PermissionError):
+                        messages.append(f"Permission error: {outcome}")
+                    elif isinstance(outcome, Exception):
+                        messages.append(f"An error occurred: {outcome}")
                     else:
-                        raise FileExistsError(f'The file {file} already exists int the destination path {destination}.')
-            except FileNotFoundError as e_file:
-                print(f"File not found error: {e_file}")
-            except PermissionError as e_permission:
-                print(f"Permission error: {e_permission}")
-            except Exception as e_inner:
-                print(f"An error occurred: {e_inner}")
+                        files_count += outcome
     except AssertionError as e_assert:
-        print(f"Assertion error: {e_assert}")
+        messages.append(f"Assertion error: {e_assert}")
     except Exception as e_outer:
-        print(f"An error occurred: {e_outer}")
+        messages.append(f"An error occurred: {e_outer}")
+    finally:
+        if messages:
+            print('\n'.join(messages))
     return files_count
 
 
+def dumps_json(items) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        # json.dumps coerces int, float and bool keys to strings, orjson refuses them by default
+        return orjson.dumps(items, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(items, separators=(',', ':')).encode('utf-8')
+
+
 def convert_to_json(items):
-    x = json.dumps(items)
+    x = dumps_json(items).decode('utf-8')
     print(x)